@@ -59,6 +59,7 @@ class User(Base):
 
     tokens = relationship("Token", back_populates="token_user", cascade="all, delete-orphan")
     categories = relationship("Category", back_populates="category_user", cascade="all, delete-orphan")
+    question_stats = relationship("QuestionStat", back_populates="stat_user", cascade="all, delete-orphan")
 
     @property
     def token(self):
@@ -138,6 +139,30 @@ class Question(Base):
             return f"Question {self.id} (category {self.category_id}): {qu_text}"
 
 
+class QuestionStat(Base):
+    """
+        Предрассчитанный счётчик вопросов юзера в группе.
+        group_type: поле, по которому группируются вопросы (category, job_place, job_title).
+        group_value: значение этого поля, count: кол-во оставшихся вопросов в группе
+    """
+
+    __tablename__ = "question_stat"
+    __table_args__ = (
+        sa.UniqueConstraint('user_id', 'group_type', 'group_value'),
+    )
+
+    id = sa.Column(sa.Integer, primary_key=True, index=True, autoincrement=True)
+    user_id = sa.Column(sa.Integer, sa.ForeignKey("user.id"), index=True)
+    group_type = sa.Column(sa.String(20))
+    group_value = sa.Column(sa.String(255))
+    count = sa.Column(sa.Integer, default=0, nullable=False)
+
+    stat_user = relationship("User", back_populates="question_stats")
+
+    def __str__(self):
+        return f"QuestionStat {self.id} (user {self.user_id}): {self.group_type}={self.group_value} - {self.count}"
+
+
 if __name__ == "__main__":
     try:
         # создаем таблицы
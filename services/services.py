@@ -6,9 +6,10 @@ import jwt
 import pandas as pd
 from flask import Request
 
-from database.models import Token, User, Category, Question
+from database.models import Token, User, Category
 from data.constants import SECRET_KEY
 from .errors import ServerProcessError
+from .stats import add_category, add_question
 
 
 HASH_ITERS = 390000
@@ -117,7 +118,7 @@ def upload_questions_to_db(path_to_file: str, user_id: int) -> dict:
     for category, df in dataframe_dict.items():
         category_obj = Category.query().filter_by(name=category, user_id=user_id).first()
         if not category_obj:
-            category_obj = Category.create(name=category, user_id=user_id)
+            category_obj = add_category(name=category, user_id=user_id)
 
         # цикл по строкам в листе
         for index, question_row in df.iterrows():
@@ -136,9 +137,10 @@ def upload_questions_to_db(path_to_file: str, user_id: int) -> dict:
                 continue
 
             try:
-                # добавляем вопрос в БД
-                Question.create(
-                    category_id=category_obj.id,
+                # добавляем вопрос в БД вместе с обновлением статистики
+                add_question(
+                    user_id=user_id,
+                    category_obj=category_obj,
                     client_name=client_name,
                     job_place=job_place,
                     job_title=job_title,
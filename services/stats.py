@@ -0,0 +1,215 @@
+from math import isnan
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from database.models import DBSession, Category, Question, QuestionStat
+
+
+# поля, по которым считается статистика вопросов, и их названия для дашборда
+STAT_GROUPS = {
+    'category': 'Категория',
+    'job_place': 'Место работы/учёбы',
+    'job_title': 'Должность/курс',
+}
+
+
+def normalize_group_value(value) -> str:
+    """Строковое значение группы статистики: пустые значения (None/NaN) приводятся к пустой строке"""
+
+    if value is None or (isinstance(value, float) and isnan(value)):
+        return ''
+    return str(value)
+
+
+def get_question_groups(question: Question, category_name: str) -> dict:
+    """Значения групп статистики для вопроса question из категории category_name"""
+
+    return {
+        'category': normalize_group_value(category_name),
+        'job_place': normalize_group_value(question.job_place),
+        'job_title': normalize_group_value(question.job_title),
+    }
+
+
+def change_question_stats(db: Session, user_id: int, groups: dict, delta: int) -> None:
+    """
+        Изменение счётчиков групп groups юзера на delta в рамках сессии db.
+        Опустевшие группы (кроме категорий) удаляются, чтобы статистика оставалась O(кол-ва групп)
+    """
+
+    for group_type, group_value in groups.items():
+        if delta > 0:
+            # создаём счётчик группы или прибавляем delta к уже существующему
+            db.execute(
+                insert(QuestionStat)
+                .values(user_id=user_id, group_type=group_type, group_value=group_value, count=delta)
+                .on_conflict_do_update(
+                    index_elements=['user_id', 'group_type', 'group_value'],
+                    set_={'count': QuestionStat.count + delta},
+                )
+            )
+        else:
+            # уменьшаем только существующий счётчик, не создавая отрицательных
+            db.execute(
+                sa.update(QuestionStat)
+                .where(
+                    QuestionStat.user_id == user_id,
+                    QuestionStat.group_type == group_type,
+                    QuestionStat.group_value == group_value,
+                )
+                .values(count=QuestionStat.count + delta)
+            )
+
+    if delta < 0:
+        # категории остаются со счётчиком 0, чтобы было видно, сколько вопросов в них осталось
+        db.execute(
+            sa.delete(QuestionStat)
+            .where(
+                QuestionStat.user_id == user_id,
+                QuestionStat.group_type != 'category',
+                QuestionStat.count <= 0,
+            )
+        )
+
+
+def add_category(name: str, user_id: int) -> Category:
+    """Создание категории юзера вместе с её нулевым счётчиком в одной транзакции"""
+
+    with DBSession() as db:
+        db.add(Category(name=name, user_id=user_id))
+        db.execute(
+            insert(QuestionStat)
+            .values(user_id=user_id, group_type='category', group_value=normalize_group_value(name), count=0)
+            .on_conflict_do_nothing(index_elements=['user_id', 'group_type', 'group_value'])
+        )
+    return Category.query().filter_by(name=name, user_id=user_id).first()
+
+
+def add_question(user_id: int, category_obj: Category, **question_data) -> None:
+    """Добавление вопроса в БД с обновлением статистики юзера в одной транзакции"""
+
+    with DBSession() as db:
+        new_question = Question(category_id=category_obj.id, **question_data)
+        db.add(new_question)
+        # берём значения групп из сохранённой строки, а не из исходных объектов pandas
+        db.flush()
+        db.refresh(new_question)
+        change_question_stats(
+            db=db,
+            user_id=user_id,
+            groups=get_question_groups(question=new_question, category_name=category_obj.name),
+            delta=1,
+        )
+
+
+def remove_question(user_id: int, question_id: int) -> None:
+    """Удаление вопроса из БД с обновлением статистики юзера в одной транзакции"""
+
+    with DBSession() as db:
+        question_obj = db.query(Question).filter_by(id=question_id).first()
+        groups = get_question_groups(question=question_obj, category_name=question_obj.category.name)
+
+        db.delete(question_obj)
+        change_question_stats(db=db, user_id=user_id, groups=groups, delta=-1)
+
+
+def count_question_stats(db: Session, user_id: int | None = None) -> dict:
+    """Подсчёт статистики по таблице вопросов: {(id юзера, тип группы, значение группы): кол-во}"""
+
+    group_columns = {
+        'category': Category.name,
+        'job_place': Question.job_place,
+        'job_title': Question.job_title,
+    }
+    counted_stats = {}
+
+    # считаем вопросы в каждой группе одним запросом на тип группы
+    for group_type, column in group_columns.items():
+        if group_type == 'category':
+            # внешнее соединение, чтобы пустые категории попали в статистику со счётчиком 0
+            select_query = sa.select(Category.user_id, column, sa.func.count(Question.id)).outerjoin(
+                Question, Question.category_id == Category.id
+            )
+        else:
+            select_query = sa.select(Category.user_id, column, sa.func.count(Question.id)).join(
+                Category, Question.category_id == Category.id
+            )
+        select_query = select_query.group_by(Category.user_id, column)
+        if user_id is not None:
+            select_query = select_query.where(Category.user_id == user_id)
+
+        for stat_user_id, group_value, count in db.execute(select_query):
+            key = (stat_user_id, group_type, normalize_group_value(group_value))
+            counted_stats[key] = counted_stats.get(key, 0) + count
+
+    return counted_stats
+
+
+def rebuild_question_stats(user_id: int | None = None) -> None:
+    """Пересчёт статистики по таблице вопросов для юзера user_id (или для всех юзеров)"""
+
+    with DBSession() as db:
+        # удаляем старую статистику
+        delete_query = sa.delete(QuestionStat)
+        if user_id is not None:
+            delete_query = delete_query.where(QuestionStat.user_id == user_id)
+        db.execute(delete_query)
+
+        db.add_all([
+            QuestionStat(user_id=stat_user_id, group_type=group_type, group_value=group_value, count=count)
+            for (stat_user_id, group_type, group_value), count in count_question_stats(db=db, user_id=user_id).items()
+        ])
+
+
+def check_question_stats(user_id: int | None = None) -> dict:
+    """
+        Сверка предрассчитанной статистики с подсчётом по таблице вопросов.
+        Возвращает расхождения: {(id юзера, тип группы, значение группы): (счётчик, реальное кол-во)}
+    """
+
+    with DBSession() as db:
+        counted_stats = count_question_stats(db=db, user_id=user_id)
+
+        stats_query = db.query(QuestionStat)
+        if user_id is not None:
+            stats_query = stats_query.filter_by(user_id=user_id)
+        stored_stats = {
+            (stat.user_id, stat.group_type, stat.group_value): stat.count
+            for stat in stats_query
+        }
+
+    return {
+        key: (stored_stats.get(key), counted_stats.get(key))
+        for key in stored_stats.keys() | counted_stats.keys()
+        if stored_stats.get(key) != counted_stats.get(key)
+    }
+
+
+def ensure_question_stats(user_id: int) -> None:
+    """
+        Пересчёт статистики юзера при первом открытии дашборда, если счётчиков ещё нет.
+        Нужен для юзеров, чьи вопросы были загружены до появления статистики, а flask rebuild-stats ещё не запускался
+    """
+
+    # юзер без категорий не может иметь вопросов - пересчитывать нечего
+    if QuestionStat.query().filter_by(user_id=user_id).first() or not Category.query().filter_by(user_id=user_id).first():
+        return
+    rebuild_question_stats(user_id=user_id)
+
+
+def get_question_stats(user_id: int) -> dict:
+    """Статистика вопросов юзера из предрассчитанной таблицы: {тип группы: [(значение, кол-во), ...]}"""
+
+    stats_dict = {group_type: [] for group_type in STAT_GROUPS.keys()}
+
+    stats = (
+        QuestionStat.query()
+        .filter_by(user_id=user_id)
+        .order_by(QuestionStat.group_type, QuestionStat.count.desc(), QuestionStat.group_value)
+    )
+    for stat in stats:
+        stats_dict.setdefault(stat.group_type, []).append((stat.group_value, stat.count))
+
+    return stats_dict
@@ -2,15 +2,18 @@ import random
 from os import listdir, mkdir, remove
 from datetime import datetime
 
+import click
 from flask import render_template, request, make_response, url_for, abort
 from sqlalchemy.exc import IntegrityError
 
 from data.constants import BASEDIR, IP_OR_DOMAIN, app
-from database.models import User, Category, Question
+from database.models import User, Category
 from .errors import PermissionsDenied, ServerProcessError
 from .services import (make_password, check_password, get_user_from_request,
                        check_token_in_db, check_token_expired, remove_token,
                        upload_questions_to_db)
+from .stats import (STAT_GROUPS, remove_question, rebuild_question_stats, check_question_stats,
+                    ensure_question_stats, get_question_stats)
 
 
 AUTH_HEADER_PREFIX = 'bearer'
@@ -25,7 +28,7 @@ def check_auth_token():
     auth_cookie = request.cookies.get('Authorization')
 
     # если для эндпоинта требуется авторизация
-    if relative_url in ['/categories', '/load_excel'] or relative_url.startswith('/question'):
+    if relative_url in ['/categories', '/load_excel', '/stats'] or relative_url.startswith('/question'):
         # если юзер не авторизован
         if not auth_cookie:
             return render_template(
@@ -286,7 +289,7 @@ def questions(category_id):
     if all_questions := category_obj.category_questions:
         # если вопросы в категории ещё остались
         random_question = random.choice(all_questions)
-        Question.delete(pk=random_question.id)
+        remove_question(user_id=user.id, question_id=random_question.id)
 
         return render_template(
             "get_questions.html",
@@ -304,3 +307,46 @@ def questions(category_id):
         category_name=category_obj.name,
         category_id=category_obj.id,
     )
+
+
+@app.route("/stats")
+def stats():
+    # получаем объект юзера из запроса
+    user = get_user_from_request(request=request)
+
+    # досчитываем статистику, если для юзера ещё не запускался flask rebuild-stats
+    ensure_question_stats(user_id=user.id)
+    # достаём предрассчитанную статистику вопросов юзера
+    stats_dict = get_question_stats(user_id=user.id)
+    total_questions = sum(count for _, count in stats_dict['category'])
+
+    return render_template(
+        "get_stats.html",
+        stat_groups=STAT_GROUPS,
+        stats_dict=stats_dict,
+        total_questions=total_questions,
+        empty=not stats_dict['category'],
+    )
+
+
+@app.cli.command("rebuild-stats")
+@click.option('--user-id', type=int, default=None, help='id юзера (по умолчанию - все юзеры)')
+def rebuild_stats(user_id):
+    """Пересчёт статистики вопросов по таблице question"""
+
+    rebuild_question_stats(user_id=user_id)
+    click.echo("Статистика вопросов пересчитана успешно!")
+
+
+@app.cli.command("check-stats")
+@click.option('--user-id', type=int, default=None, help='id юзера (по умолчанию - все юзеры)')
+def check_stats(user_id):
+    """Сверка статистики вопросов с таблицей question"""
+
+    mismatches = check_question_stats(user_id=user_id)
+    for (stat_user_id, group_type, group_value), (stored_count, real_count) in sorted(mismatches.items()):
+        click.echo(f"user {stat_user_id}: {group_type}={group_value!r} - счётчик {stored_count}, вопросов {real_count}")
+
+    if mismatches:
+        raise click.ClickException(f"Расхождений в статистике: {len(mismatches)}")
+    click.echo("Статистика вопросов совпадает с таблицей question!")